@@ -1,32 +1,117 @@
+import asyncio
+import io
 import os
-import json
+import queue
+import threading
+import time
+import zipfile
+import orjson
 import yaml
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any, List, Union
-from PIL import Image
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
+from PIL import Image, ImageOps
 import requests
 from google import genai
 from google.genai import types
 import logging
 from dataclasses import dataclass
+from datetime import datetime
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Content hashing for the response cache; blake3 is much faster when installed
+try:
+    from blake3 import blake3 as _hasher
+except ImportError:
+    from hashlib import blake2b as _hasher
+
+def _file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Hex digest of a file's bytes, read in chunks"""
+    hasher = _hasher()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()[:64]
+
+# Optional document backends, resolved once at import time
+try:
+    from docx import Document
+except ImportError:
+    Document = None
+
+try:
+    import pymupdf as fitz
+except ImportError:
+    try:
+        import fitz  # PyMuPDF releases before the pymupdf module name
+    except ImportError:
+        fitz = None
+
+try:
+    import PyPDF2
+except ImportError:
+    PyPDF2 = None
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# WordprocessingML namespace used when reading DOCX XML directly
+_W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+# Same runs python-docx's Paragraph.text covers: direct runs and hyperlink runs
+_DOCX_RUN_ITEM_TEST = (
+    'self::w:t or self::w:tab or self::w:ptab or self::w:br or self::w:cr or self::w:noBreakHyphen'
+)
+# PyMuPDF does not support concurrent use from several threads, and
+# process_files/process_files_async load files on worker threads
+_FITZ_LOCK = threading.Lock()
+
+# Never resolve entities from the document; python-docx parses the same way
+_DOCX_XML_PARSER = etree.XMLParser(resolve_entities=False) if etree is not None else None
+
+_DOCX_RUN_ITEMS = etree.XPath(
+    f'./w:r/*[{_DOCX_RUN_ITEM_TEST}] | ./w:hyperlink/w:r/*[{_DOCX_RUN_ITEM_TEST}]',
+    namespaces={'w': _W_NS}
+) if etree is not None else None
+
+# Fixed text for empty run elements; w:t carries its own text and w:br depends on its type
+_DOCX_RUN_ITEM_TEXT = {
+    f'{{{_W_NS}}}tab': '\t',
+    f'{{{_W_NS}}}ptab': '\t',
+    f'{{{_W_NS}}}cr': '\n',
+    f'{{{_W_NS}}}noBreakHyphen': '-'
+}
+
+@dataclass(slots=True)
 class ProcessedData:
     """Data structure for processed content"""
     content: Any
     metadata: Dict[str, Any]
     data_type: str
     source_file: str
+    extension: str = ''
 
 class DataLoader(ABC):
     """Abstract base class for data loaders"""
     
+    __slots__ = ('config',)
+    
+    EXTENSIONS: frozenset = frozenset()
+    DATA_TYPE: str = ''
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
     
@@ -43,15 +128,20 @@ class DataLoader(ABC):
 class ImageLoader(DataLoader):
     """Loader for image files"""
     
+    __slots__ = ()
+    
+    EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'})
+    DATA_TYPE = 'image'
+    
     def supports(self, file_extension: str) -> bool:
-        return file_extension.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
+        return file_extension.lower() in self.EXTENSIONS
     
     def load(self, file_path: str) -> ProcessedData:
         try:
-            with open(file_path, 'rb') as f:
-                image_bytes = f.read()
+            image_bytes = self._read_bytes(file_path)
             
-            image = Image.open(file_path)
+            # Only the header is parsed here; pixels are never decoded
+            image = Image.open(io.BytesIO(image_bytes))
             
             metadata = {
                 'format': image.format,
@@ -60,37 +150,80 @@ class ImageLoader(DataLoader):
                 'file_size': len(image_bytes)
             }
             
+            max_dimension = self.config.get('data_processing', {}).get('max_image_dimension')
+            if max_dimension and image.format == 'JPEG' and max(image.size) > max_dimension:
+                image_bytes, metadata['resized_to'] = self._shrink_jpeg(image, max_dimension)
+            
             return ProcessedData(
                 content=image_bytes,
                 metadata=metadata,
-                data_type='image',
-                source_file=file_path
+                data_type=self.DATA_TYPE,
+                source_file=file_path,
+                extension=Path(file_path).suffix.lower()
             )
         except Exception as e:
             logger.error(f"Error loading image {file_path}: {str(e)}")
             raise
+    
+    def _read_bytes(self, file_path: str) -> bytes:
+        """Read a whole file with sized os.read calls, which run without the GIL"""
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            remaining = os.fstat(fd).st_size
+            chunks = []
+            while remaining > 0:
+                chunk = os.read(fd, remaining)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+        finally:
+            os.close(fd)
+        
+        return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+    
+    def _shrink_jpeg(self, image: Image.Image, max_dimension: int) -> Tuple[bytes, Tuple[int, int]]:
+        """Downscale a JPEG, letting the decoder shrink on load via draft mode"""
+        icc_profile = image.info.get('icc_profile')
+        image.draft('RGB', (max_dimension, max_dimension))
+        # Re-encoding drops EXIF, so bake the orientation into the pixels first
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension))
+        
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=90, icc_profile=icc_profile)
+        return buffer.getvalue(), image.size
 
 class TextLoader(DataLoader):
     """Loader for text files"""
     
+    __slots__ = ()
+    
+    EXTENSIONS = frozenset({'.txt', '.md', '.json', '.xml', '.html'})
+    DATA_TYPE = 'text'
+    
     def supports(self, file_extension: str) -> bool:
-        return file_extension.lower() in ['.txt', '.md', '.json', '.xml', '.html']
+        return file_extension.lower() in self.EXTENSIONS
     
     def load(self, file_path: str) -> ProcessedData:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text_content = f.read()
+            # One read and one decode, skipping TextIOWrapper's chunked decoding
+            text_content = Path(file_path).read_bytes().decode('utf-8')
+            if '\r' in text_content:
+                # Keep the universal-newline translation text mode used to apply
+                text_content = text_content.replace('\r\n', '\n').replace('\r', '\n')
             
             metadata = {
                 'file_size': len(text_content),
-                'line_count': len(text_content.splitlines()),
+                # Counts '\n'-terminated lines only (splitlines also breaks on \f, \v, \u2028, ...)
+                'line_count': text_content.count('\n') + (bool(text_content) and not text_content.endswith('\n')),
                 'encoding': 'utf-8'
             }
             
             return ProcessedData(
                 content=text_content,
                 metadata=metadata,
-                data_type='text',
+                data_type=self.DATA_TYPE,
                 source_file=file_path
             )
         except Exception as e:
@@ -100,19 +233,26 @@ class TextLoader(DataLoader):
 class DocumentLoader(DataLoader):
     """Loader for document files (DOCX, PDF)"""
     
+    __slots__ = ()
+    
+    EXTENSIONS = frozenset({'.docx', '.pdf'})
+    DATA_TYPE = 'document'
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self._install_dependencies()
     
     def _install_dependencies(self):
-        try:
-            import docx
-            import PyPDF2
-        except ImportError:
-            logger.warning("Document processing libraries not found. Install: pip install python-docx pypdf2")
+        if Document is None:
+            logger.warning("Document processing libraries not found. Install: pip install python-docx pymupdf")
+        if fitz is None:
+            if PyPDF2 is not None:
+                logger.warning("PyMuPDF not found, falling back to slower PyPDF2. Install: pip install pymupdf")
+            else:
+                logger.warning("PDF processing libraries not found. Install: pip install pymupdf")
     
     def supports(self, file_extension: str) -> bool:
-        return file_extension.lower() in ['.docx', '.pdf']
+        return file_extension.lower() in self.EXTENSIONS
     
     def load(self, file_path: str) -> ProcessedData:
         file_extension = Path(file_path).suffix.lower()
@@ -127,18 +267,16 @@ class DocumentLoader(DataLoader):
             raise
     
     def _load_docx(self, file_path: str) -> ProcessedData:
-        from docx import Document
-        
-        doc = Document(file_path)
-        text_content = []
-        
-        for paragraph in doc.paragraphs:
-            text_content.append(paragraph.text)
+        try:
+            text_content = self._read_docx_paragraphs(file_path)
+        except (ImportError, KeyError):
+            # No lxml, or the main part is not at word/document.xml
+            text_content = self._read_docx_paragraphs_python_docx(file_path)
         
         full_text = '\n'.join(text_content)
         
         metadata = {
-            'paragraph_count': len(doc.paragraphs),
+            'paragraph_count': len(text_content),
             'file_size': os.path.getsize(file_path),
             'format': 'docx'
         }
@@ -146,12 +284,78 @@ class DocumentLoader(DataLoader):
         return ProcessedData(
             content=full_text,
             metadata=metadata,
-            data_type='document',
+            data_type=self.DATA_TYPE,
             source_file=file_path
         )
     
+    def _read_docx_paragraphs(self, file_path: str) -> List[str]:
+        """Extract body paragraph text with a single parse of word/document.xml"""
+        if etree is None:
+            raise ImportError("lxml is required for fast DOCX extraction. Install: pip install lxml")
+        
+        with zipfile.ZipFile(file_path) as archive:
+            root = etree.fromstring(archive.read('word/document.xml'), _DOCX_XML_PARSER)
+        
+        t_tag, br_tag = f'{{{_W_NS}}}t', f'{{{_W_NS}}}br'
+        br_type = f'{{{_W_NS}}}type'
+        
+        paragraphs = []
+        for paragraph in root.find(f'{{{_W_NS}}}body').iterchildren(f'{{{_W_NS}}}p'):
+            parts = []
+            for item in _DOCX_RUN_ITEMS(paragraph):
+                if item.tag == t_tag:
+                    parts.append(item.text or '')
+                elif item.tag == br_tag:
+                    # Line breaks become newlines; page/column breaks add no text
+                    if item.get(br_type, 'textWrapping') == 'textWrapping':
+                        parts.append('\n')
+                else:
+                    parts.append(_DOCX_RUN_ITEM_TEXT[item.tag])
+            paragraphs.append(''.join(parts))
+        
+        return paragraphs
+    
+    def _read_docx_paragraphs_python_docx(self, file_path: str) -> List[str]:
+        if Document is None:
+            raise ImportError("python-docx is required to load DOCX files. Install: pip install python-docx")
+        
+        doc = Document(file_path)
+        return [paragraph.text for paragraph in doc.paragraphs]
+    
     def _load_pdf(self, file_path: str) -> ProcessedData:
-        import PyPDF2
+        if fitz is None:
+            return self._load_pdf_pypdf2(file_path)
+        
+        buffer = io.StringIO()
+        write = buffer.write
+        with _FITZ_LOCK, fitz.open(file_path) as doc:
+            for page_num, page in enumerate(doc):
+                if page_num:
+                    write("\n")
+                write("--- Page ")
+                write(str(page_num + 1))
+                write(" ---\n")
+                write(page.get_text())
+            page_count = doc.page_count
+        
+        full_text = buffer.getvalue()
+        
+        metadata = {
+            'page_count': page_count,
+            'file_size': os.path.getsize(file_path),
+            'format': 'pdf'
+        }
+        
+        return ProcessedData(
+            content=full_text,
+            metadata=metadata,
+            data_type=self.DATA_TYPE,
+            source_file=file_path
+        )
+    
+    def _load_pdf_pypdf2(self, file_path: str) -> ProcessedData:
+        if PyPDF2 is None:
+            raise ImportError("A PDF library is required to load PDF files. Install: pip install pymupdf")
         
         text_content = []
         with open(file_path, 'rb') as f:
@@ -172,36 +376,50 @@ class DocumentLoader(DataLoader):
         return ProcessedData(
             content=full_text,
             metadata=metadata,
-            data_type='document',
+            data_type=self.DATA_TYPE,
             source_file=file_path
         )
 
 class SpreadsheetLoader(DataLoader):
     """Loader for spreadsheet files (XLSX, CSV)"""
     
+    __slots__ = ()
+    
+    EXTENSIONS = frozenset({'.xlsx', '.xls', '.csv'})
+    DATA_TYPE = 'spreadsheet'
+    
     def supports(self, file_extension: str) -> bool:
-        return file_extension.lower() in ['.xlsx', '.xls', '.csv']
+        return file_extension.lower() in self.EXTENSIONS
     
     def load(self, file_path: str) -> ProcessedData:
         file_extension = Path(file_path).suffix.lower()
         
         try:
             if file_extension == '.csv':
-                df = pd.read_csv(file_path)
+                # Only the preview rows are held in memory; rows are counted in a streaming pass
+                head = pd.read_csv(file_path, nrows=10)
+                row_count = self._count_csv_rows(file_path)
+                df = None
             else:
                 df = pd.read_excel(file_path)
+                head, row_count = df.head(10), df.shape[0]
+            
+            columns = head.columns.tolist()
+            shape = (row_count, len(columns))
             
-            # Convert to structured format
+            # The prompt only needs the preview rows; the full frame is kept
+            # as-is for callers that want it (None for CSVs, which are never fully read)
             data_dict = {
-                'columns': df.columns.tolist(),
-                'data': df.fillna('').to_dict('records'),
-                'shape': df.shape
+                'columns': columns,
+                'head': head.astype(object).fillna(''),
+                'shape': shape,
+                'dataframe': df
             }
             
             metadata = {
-                'row_count': df.shape[0],
-                'column_count': df.shape[1],
-                'columns': df.columns.tolist(),
+                'row_count': shape[0],
+                'column_count': shape[1],
+                'columns': columns,
                 'file_size': os.path.getsize(file_path),
                 'format': file_extension[1:]
             }
@@ -209,12 +427,19 @@ class SpreadsheetLoader(DataLoader):
             return ProcessedData(
                 content=data_dict,
                 metadata=metadata,
-                data_type='spreadsheet',
+                data_type=self.DATA_TYPE,
                 source_file=file_path
             )
         except Exception as e:
             logger.error(f"Error loading spreadsheet {file_path}: {str(e)}")
             raise
+    
+    def _count_csv_rows(self, file_path: str) -> int:
+        """Count data rows without loading the whole file"""
+        # Same parser and rules as the preview read (quoted headers, short rows,
+        # header-only files), keeping only the first column of each chunk
+        chunks = pd.read_csv(file_path, usecols=[0], dtype=str, chunksize=1_000_000)
+        return sum(len(chunk) for chunk in chunks)
 
 class DataLoaderFactory:
     """Factory class for creating appropriate data loaders"""
@@ -226,13 +451,26 @@ class DataLoaderFactory:
             DocumentLoader(config),
             SpreadsheetLoader(config)
         ]
+        
+        # Extension -> loader dispatch table; first registered loader wins
+        self._by_extension = {}
+        for loader in self.loaders:
+            for extension in loader.EXTENSIONS:
+                self._by_extension.setdefault(extension, loader)
     
     def get_loader(self, file_path: str) -> DataLoader:
         """Get appropriate loader for file type"""
+        return self._loader_for_extension(Path(file_path).suffix.lower())
+    
+    def load(self, file_path: str) -> ProcessedData:
+        """Load a file with the appropriate loader, recording its extension"""
         file_extension = Path(file_path).suffix.lower()
-        
-        for loader in self.loaders:
-            if loader.supports(file_extension):
-                return loader
-        
-        raise ValueError(f"No loader available for file type: {file_extension}")
+        processed_data = self._loader_for_extension(file_extension).load(file_path)
+        processed_data.extension = file_extension
+        return processed_data
+    
+    def _loader_for_extension(self, file_extension: str) -> DataLoader:
+        try:
+            return self._by_extension[file_extension]
+        except KeyError:
+            raise ValueError(f"No loader available for file type: {file_extension}") from None
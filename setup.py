@@ -9,11 +9,14 @@ setup(
         "google-genai>=0.3.0",
         "Pillow>=9.0.0",
         "pandas>=1.5.0",
+        "orjson>=3.6.0",
         "PyYAML>=6.0",
         "python-docx>=0.8.11",
+        "pymupdf>=1.23.0",
         "PyPDF2>=2.0.0",
         "openpyxl>=3.0.0",
         "requests>=2.28.0",
+        "blake3>=0.3.0",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.10",
 )
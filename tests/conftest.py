@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The modules live at the repository root rather than in a package
+sys.path.insert(0, str(ROOT))
+
+
+class StubModels:
+    """Stands in for ``genai.Client().models``, recording each request"""
+
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, model, contents, config):
+        self.calls.append(contents)
+        return SimpleNamespace(text=f"response {len(self.calls)}")
+
+
+class StubAioModels(StubModels):
+    async def generate_content(self, model, contents, config):
+        return StubModels.generate_content(self, model, contents, config)
+
+
+class StubClient:
+    def __init__(self):
+        self.models = StubModels()
+        self.aio = SimpleNamespace(models=StubAioModels())
+
+
+@pytest.fixture(scope="session")
+def processor_class():
+    # vertex_integration.py has no imports of its own; it runs on top of data_loader
+    import data_loader
+
+    namespace = dict(vars(data_loader))
+    source = ROOT / "vertex_integration.py"
+    exec(compile(source.read_text(encoding="utf-8"), str(source), "exec"), namespace)
+    return namespace["GeminiVertexAIProcessor"]
+
+
+@pytest.fixture
+def make_processor(tmp_path, monkeypatch, processor_class):
+    """Build a processor with a stub Gemini client and output under tmp_path"""
+    from google import genai
+
+    monkeypatch.setattr(genai, "Client", StubClient)
+    # _initialize_client sets these; register them so monkeypatch restores them
+    for name in ("GOOGLE_CLOUD_PROJECT", "GOOGLE_CLOUD_LOCATION", "GOOGLE_GENAI_USE_VERTEXAI"):
+        monkeypatch.setenv(name, "")
+
+    def make(**output):
+        config = yaml.safe_load((ROOT / "config.yaml").read_text(encoding="utf-8"))
+        config["output"].update(
+            save_results=False, output_directory=str(tmp_path / "results"), **output
+        )
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(config), encoding="utf-8")
+        return processor_class(str(config_path))
+
+    return make
+
+
+@pytest.fixture
+def text_files(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"file{i}.txt"
+        path.write_text(f"text {i}\n", encoding="utf-8")
+        paths.append(str(path))
+    return paths
@@ -0,0 +1,112 @@
+import zipfile
+
+import pytest
+
+from data_loader import DocumentLoader, SpreadsheetLoader
+
+
+@pytest.fixture
+def spreadsheet_loader():
+    return SpreadsheetLoader({})
+
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "data.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_csv_header_only_has_no_rows(tmp_path, spreadsheet_loader):
+    data = spreadsheet_loader.load(write_csv(tmp_path, "a,b\n"))
+
+    assert data.metadata['row_count'] == 0
+    assert data.content['columns'] == ['a', 'b']
+
+
+def test_csv_short_rows_are_counted(tmp_path, spreadsheet_loader):
+    data = spreadsheet_loader.load(write_csv(tmp_path, "a,b,c\n1,2,3\n4,5\n6\n"))
+
+    assert data.metadata['row_count'] == 3
+    assert data.content['shape'] == (3, 3)
+
+
+def test_csv_quoted_multiline_header_is_one_row(tmp_path, spreadsheet_loader):
+    data = spreadsheet_loader.load(write_csv(tmp_path, '"first\nname",age\nann,3\n'))
+
+    assert data.metadata['row_count'] == 1
+    assert data.content['columns'] == ['first\nname', 'age']
+
+
+def build_docx(path):
+    docx = pytest.importorskip("docx")
+    from docx.enum.text import WD_BREAK
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
+    document = docx.Document()
+    document.add_paragraph("Plain paragraph")
+
+    paragraph = document.add_paragraph("a\tb")
+    run = paragraph.add_run("x")
+    for tag in ("w:noBreakHyphen", "w:ptab", "w:cr"):
+        run._r.append(OxmlElement(tag))
+    run.add_break()
+    paragraph.add_run("page").add_break(WD_BREAK.PAGE)
+    paragraph.add_run("y")
+
+    hyperlink = OxmlElement("w:hyperlink")
+    hyperlink.set(qn("r:id"), "rId99")
+    link_run = OxmlElement("w:r")
+    link_text = OxmlElement("w:t")
+    link_text.text = "link"
+    link_run.append(link_text)
+    hyperlink.append(link_run)
+    paragraph._p.append(hyperlink)
+
+    document.add_paragraph("")
+    document.add_table(rows=1, cols=1).cell(0, 0).text = "in table"
+    document.add_paragraph("end")
+    document.save(path)
+    return docx.Document(path)
+
+
+def test_docx_xml_extraction_matches_python_docx(tmp_path):
+    pytest.importorskip("lxml")
+    path = str(tmp_path / "doc.docx")
+    expected = [paragraph.text for paragraph in build_docx(path).paragraphs]
+
+    loader = DocumentLoader({})
+
+    assert loader._read_docx_paragraphs(path) == expected
+    assert loader.load(path).content == "\n".join(expected)
+
+
+def build_docx_with_external_entity(path):
+    build_docx(path)
+    with zipfile.ZipFile(path) as archive:
+        parts = {name: archive.read(name) for name in archive.namelist()}
+
+    parts['word/document.xml'] = (
+        b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        b'<!DOCTYPE w:document [<!ENTITY e SYSTEM "file:///etc/hostname">]>\n'
+        b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        b'<w:body><w:p><w:r><w:t xml:space="preserve">hello &e;</w:t></w:r></w:p></w:body>'
+        b'</w:document>'
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in parts.items():
+            archive.writestr(name, data)
+
+    import docx
+    return docx.Document(path)
+
+
+def test_docx_xml_extraction_does_not_resolve_entities(tmp_path):
+    pytest.importorskip("lxml")
+    path = str(tmp_path / "entity.docx")
+    expected = [paragraph.text for paragraph in build_docx_with_external_entity(path).paragraphs]
+
+    loader = DocumentLoader({})
+
+    assert expected == ['hello ']
+    assert loader._read_docx_paragraphs(path) == expected
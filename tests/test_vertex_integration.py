@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+
+def wait_for_threads(count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while threading.active_count() > count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return threading.active_count()
+
+
+def test_stream_yields_results_in_input_order(make_processor, text_files):
+    processor = make_processor()
+
+    results = list(processor.process_stream(text_files, prefetch=1))
+
+    assert [r["source_file"] for r in results] == text_files
+    assert len(processor.client.models.calls) == len(text_files)
+
+
+def test_stream_stops_at_loader_error(make_processor, text_files, tmp_path):
+    processor = make_processor()
+    missing = str(tmp_path / "missing.txt")
+    stream = processor.process_stream([text_files[0], missing, text_files[1]])
+
+    assert next(stream)["source_file"] == text_files[0]
+    with pytest.raises(FileNotFoundError):
+        next(stream)
+    assert len(processor.client.models.calls) == 1
+
+
+def test_stream_raises_when_paths_iterable_fails(make_processor, text_files):
+    processor = make_processor()
+
+    def paths():
+        yield text_files[0]
+        raise OSError("listing failed")
+
+    stream = processor.process_stream(paths())
+
+    assert next(stream)["source_file"] == text_files[0]
+    with pytest.raises(OSError, match="listing failed"):
+        next(stream)
+
+
+def test_stream_early_break_stops_producer(make_processor, text_files):
+    processor = make_processor()
+    baseline = threading.active_count()
+
+    stream = processor.process_stream(text_files * 10, prefetch=1)
+    for result in stream:
+        break
+    stream.close()
+
+    assert wait_for_threads(baseline) == baseline
+
+
+def test_process_files_returns_results_by_path(make_processor, text_files):
+    processor = make_processor()
+
+    results = processor.process_files([(path, None, "default") for path in text_files])
+
+    assert list(results) == text_files
+    assert all(results[path]["source_file"] == path for path in text_files)
+
+
+def test_process_files_rejects_duplicate_paths(make_processor, text_files):
+    processor = make_processor()
+    jobs = [(text_files[0], None, "default"), (text_files[0], "Summarize", "default")]
+
+    with pytest.raises(ValueError, match="Duplicate file path"):
+        processor.process_files(jobs)
+    assert processor.client.models.calls == []
+
+
+def test_process_files_async_returns_results_by_path(make_processor, text_files):
+    processor = make_processor()
+    jobs = [(path, None, "default") for path in text_files]
+
+    results = asyncio.run(processor.process_files_async(jobs, max_concurrent_requests=2))
+
+    assert list(results) == text_files
+    assert all(results[path]["source_file"] == path for path in text_files)
+    assert len(processor.client.aio.models.calls) == len(text_files)
+
+
+def test_process_files_async_rejects_duplicate_paths(make_processor, text_files):
+    processor = make_processor()
+    jobs = [(text_files[0], None, "default"), (text_files[0], "Summarize", "default")]
+
+    with pytest.raises(ValueError, match="Duplicate file path"):
+        asyncio.run(processor.process_files_async(jobs))
+    assert processor.client.aio.models.calls == []
+
+
+def test_cache_hit_skips_loader_and_gemini(make_processor, text_files, monkeypatch):
+    processor = make_processor(cache_results=True)
+    first = processor.process_file(text_files[0])
+
+    def fail(file_path):
+        raise AssertionError(f"loader called for cached file {file_path}")
+
+    monkeypatch.setattr(processor.loader_factory, "load", fail)
+
+    assert processor.process_file(text_files[0]) == first
+    assert [r["response"] for r in processor.process_stream(text_files[:1])] == [first["response"]]
+    assert len(processor.client.models.calls) == 1
+
+
+def test_cache_misses_for_a_different_prompt(make_processor, text_files):
+    processor = make_processor(cache_results=True)
+    processor.process_file(text_files[0])
+
+    processor.process_file(text_files[0], prompt_type="sentiment")
+
+    assert len(processor.client.models.calls) == 2
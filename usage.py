@@ -4,41 +4,29 @@ def main():
     # Initialize processor
     processor = GeminiVertexAIProcessor("config.yaml")
     
-    # Example 1: Process an image
+    # Process an image, a document, a spreadsheet and a text file concurrently
+    results = asyncio.run(processor.process_files_async([
+        ("sample_image.jpg", "What objects can you identify in this image?", "default"),
+        ("sample_document.pdf", "Summarize the main points of this document", "detailed"),
+        ("sample_data.xlsx", "Analyze the trends in this data", "trends"),
+        ("sample_text.txt", "Extract all email addresses and phone numbers from this text", "default"),
+    ]))
+    
+    # Example 1: Image
     print("=== Processing Image ===")
-    image_results = processor.process_file(
-        "sample_image.jpg",
-        question="What objects can you identify in this image?",
-        prompt_type="default"
-    )
-    print(f"Image Analysis: {image_results['response']}")
+    print(f"Image Analysis: {results['sample_image.jpg']['response']}")
     
-    # Example 2: Process a document
+    # Example 2: Document
     print("\n=== Processing Document ===")
-    doc_results = processor.process_file(
-        "sample_document.pdf",
-        question="Summarize the main points of this document",
-        prompt_type="detailed"
-    )
-    print(f"Document Summary: {doc_results['response']}")
+    print(f"Document Summary: {results['sample_document.pdf']['response']}")
     
-    # Example 3: Process a spreadsheet
+    # Example 3: Spreadsheet
     print("\n=== Processing Spreadsheet ===")
-    spreadsheet_results = processor.process_file(
-        "sample_data.xlsx",
-        question="Analyze the trends in this data",
-        prompt_type="trends"
-    )
-    print(f"Data Analysis: {spreadsheet_results['response']}")
+    print(f"Data Analysis: {results['sample_data.xlsx']['response']}")
     
-    # Example 4: Process text file with custom prompt
+    # Example 4: Text file with custom prompt
     print("\n=== Processing Text File ===")
-    text_results = processor.process_file(
-        "sample_text.txt",
-        question="Extract all email addresses and phone numbers from this text",
-        prompt_type="default"
-    )
-    print(f"Text Extraction: {text_results['response']}")
+    print(f"Text Extraction: {results['sample_text.txt']['response']}")
 
 if __name__ == "__main__":
     main()
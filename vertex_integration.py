@@ -1,3 +1,12 @@
+_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.bmp': 'image/bmp',
+    '.webp': 'image/webp'
+}
+
 class GeminiVertexAIProcessor:
     """Main processor class for Gemini Vertex AI"""
     
@@ -6,11 +15,33 @@ class GeminiVertexAIProcessor:
         self.client = self._initialize_client()
         self.loader_factory = DataLoaderFactory(self.config)
         
+        # Hoist per-request config lookups out of the hot path
+        self._model = self.config['gemini']['model']
+        self._gen_cfg = types.GenerateContentConfig(
+            max_output_tokens=self.config['gemini']['max_tokens'],
+            temperature=self.config['gemini']['temperature']
+        )
+        self._prompts = {
+            data_type: self.config['prompts'][section]
+            for data_type, section in {
+                'image': 'image_analysis',
+                'document': 'document_summary',
+                'spreadsheet': 'spreadsheet_analysis',
+                'text': 'text_processing'
+            }.items()
+        }
+        
+        # On-disk response cache keyed by file content, prompt and model
+        self._cache_dir = None
+        if self.config['output'].get('cache_results', False):
+            self._cache_dir = Path(self.config['output']['output_directory']) / '_cache'
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+        
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from YAML file"""
         try:
             with open(config_path, 'r') as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=_YamlLoader)
         except Exception as e:
             logger.error(f"Error loading config file: {str(e)}")
             raise
@@ -31,114 +62,237 @@ class GeminiVertexAIProcessor:
     def process_file(self, file_path: str, question: str = None, prompt_type: str = "default") -> Dict[str, Any]:
         """Process a file with Gemini Vertex AI"""
         try:
-            # Load data using appropriate loader
-            loader = self.loader_factory.get_loader(file_path)
-            processed_data = loader.load(file_path)
+            # Cached responses skip loading altogether
+            prompt, cache_path, cached = self._lookup(file_path, question, prompt_type)
+            if cached is not None:
+                return cached
             
-            # Generate appropriate prompt
-            prompt = self._generate_prompt(processed_data.data_type, question, prompt_type)
-            
-            # Process with Gemini
-            response = self._send_to_gemini(processed_data, prompt)
+            # Load data using appropriate loader
+            processed_data = self.loader_factory.load(file_path)
             
-            # Format and return results
-            return self._format_results(processed_data, response, prompt)
+            return self._process_loaded(processed_data, prompt, cache_path)
             
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {str(e)}")
             raise
     
+    def _lookup(self, file_path: str, question: str = None,
+                prompt_type: str = "default") -> Tuple[str, Optional[Path], Optional[Dict[str, Any]]]:
+        """Resolve the prompt and cache entry for a file before anything is loaded"""
+        data_type = self.loader_factory.get_loader(file_path).DATA_TYPE
+        
+        # Generate appropriate prompt
+        prompt = self._generate_prompt(data_type, question, prompt_type)
+        
+        cache_path = self._cache_path(file_path, data_type, prompt)
+        return prompt, cache_path, self._read_cache(cache_path, file_path)
+    
+    def _process_loaded(self, processed_data: ProcessedData, prompt: str,
+                        cache_path: Optional[Path] = None) -> Dict[str, Any]:
+        """Prompt Gemini with already loaded data and format the response"""
+        # Process with Gemini
+        response = self._send_to_gemini(processed_data, prompt)
+        
+        # Format and return results
+        results = self._format_results(processed_data, response, prompt)
+        self._write_cache(cache_path, results)
+        return results
+    
+    def process_files(self, jobs: List[Tuple[str, str, str]], max_workers: int = 8) -> Dict[str, Dict[str, Any]]:
+        """Process several files concurrently, overlapping loading and Gemini calls
+
+        Each job is a ``(file_path, question, prompt_type)`` tuple. Results are
+        returned keyed by file path, so each path may appear only once.
+        """
+        self._check_unique_paths(jobs)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                file_path: executor.submit(self.process_file, file_path, question, prompt_type)
+                for file_path, question, prompt_type in jobs
+            }
+            return {file_path: future.result() for file_path, future in futures.items()}
+    
+    def _check_unique_paths(self, jobs: List[Tuple[str, str, str]]):
+        """Reject batches that would return fewer results than jobs"""
+        seen = set()
+        for file_path, _, _ in jobs:
+            if file_path in seen:
+                raise ValueError(f"Duplicate file path in jobs: {file_path}")
+            seen.add(file_path)
+    
+    def process_stream(self, file_paths: Iterable[str], question: str = None, prompt_type: str = "default",
+                       prefetch: int = 2) -> Iterator[Dict[str, Any]]:
+        """Process files in order, loading the next ones while Gemini handles the current one
+
+        A background thread checks the cache, runs the loaders and keeps up to
+        ``prefetch`` loaded files queued; results are yielded as each Gemini call returns.
+        """
+        loaded = queue.Queue(maxsize=prefetch)
+        done = object()
+        stop = threading.Event()
+        
+        def put(item) -> bool:
+            # Poll so the producer exits once the consumer has stopped reading
+            while not stop.is_set():
+                try:
+                    loaded.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def produce():
+            try:
+                for file_path in file_paths:
+                    try:
+                        prompt, cache_path, cached = self._lookup(file_path, question, prompt_type)
+                        processed_data = self.loader_factory.load(file_path) if cached is None else None
+                        item = (file_path, (prompt, cache_path, cached, processed_data), None)
+                    except Exception as e:
+                        item = (file_path, None, e)
+                    if not put(item) or item[2] is not None:
+                        return
+            except Exception as e:
+                # The file_paths iterable itself failed
+                put((None, None, e))
+                return
+            put(done)
+        
+        threading.Thread(target=produce, daemon=True).start()
+        
+        try:
+            while True:
+                item = loaded.get()
+                if item is done:
+                    return
+                file_path, job, error = item
+                try:
+                    if error is not None:
+                        raise error
+                    prompt, cache_path, cached, processed_data = job
+                    if cached is not None:
+                        yield cached
+                    else:
+                        yield self._process_loaded(processed_data, prompt, cache_path)
+                except Exception as e:
+                    if file_path is None:
+                        logger.error(f"Error reading file paths: {str(e)}")
+                    else:
+                        logger.error(f"Error processing file {file_path}: {str(e)}")
+                    raise
+        finally:
+            stop.set()
+    
+    async def process_files_async(self, jobs: List[Tuple[str, str, str]],
+                                  max_concurrent_requests: int = 8) -> Dict[str, Dict[str, Any]]:
+        """Process several files with concurrent Gemini requests on a single event loop
+
+        Each job is a ``(file_path, question, prompt_type)`` tuple. At most
+        ``max_concurrent_requests`` files are loaded or awaiting Gemini at once,
+        which also bounds how much loaded data is held in memory. Results are
+        returned keyed by file path, so each path may appear only once.
+        """
+        self._check_unique_paths(jobs)
+        semaphore = asyncio.Semaphore(max_concurrent_requests)
+        
+        async def process(file_path: str, question: str, prompt_type: str) -> Dict[str, Any]:
+            try:
+                async with semaphore:
+                    # Hashing and loaders block on disk and CPU, so keep them off the event loop
+                    loop = asyncio.get_running_loop()
+                    prompt, cache_path, cached = await loop.run_in_executor(
+                        None, self._lookup, file_path, question, prompt_type
+                    )
+                    if cached is not None:
+                        return cached
+                    
+                    processed_data = await loop.run_in_executor(None, self.loader_factory.load, file_path)
+                    
+                    response = await self._send_to_gemini_async(processed_data, prompt)
+                    
+                    results = self._format_results(processed_data, response, prompt)
+                    self._write_cache(cache_path, results)
+                    return results
+                
+            except Exception as e:
+                logger.error(f"Error processing file {file_path}: {str(e)}")
+                raise
+        
+        file_paths = [file_path for file_path, _, _ in jobs]
+        results = await asyncio.gather(*(process(*job) for job in jobs))
+        return dict(zip(file_paths, results))
+    
     def _generate_prompt(self, data_type: str, question: str = None, prompt_type: str = "default") -> str:
         """Generate appropriate prompt based on data type and user question"""
         if question:
             return question
         
-        prompts_config = self.config['prompts']
-        
-        if data_type == 'image':
-            return prompts_config['image_analysis'].get(prompt_type, prompts_config['image_analysis']['default'])
-        elif data_type == 'document':
-            return prompts_config['document_summary'].get(prompt_type, prompts_config['document_summary']['default'])
-        elif data_type == 'spreadsheet':
-            return prompts_config['spreadsheet_analysis'].get(prompt_type, prompts_config['spreadsheet_analysis']['default'])
-        else:
-            return prompts_config['text_processing'].get(prompt_type, prompts_config['text_processing']['default'])
+        prompts = self._prompts.get(data_type, self._prompts['text'])
+        return prompts.get(prompt_type, prompts['default'])
     
     def _send_to_gemini(self, processed_data: ProcessedData, prompt: str) -> Any:
         """Send data and prompt to Gemini Vertex AI"""
         try:
-            if processed_data.data_type == 'image':
-                # Handle image content
-                response = self.client.models.generate_content(
-                    model=self.config['gemini']['model'],
-                    contents=[
-                        types.Part.from_bytes(
-                            data=processed_data.content,
-                            mime_type=self._get_mime_type(processed_data.source_file)
-                        ),
-                        prompt
-                    ],
-                    config=types.GenerateContentConfig(
-                        max_output_tokens=self.config['gemini']['max_tokens'],
-                        temperature=self.config['gemini']['temperature']
-                    )
-                )
-            elif processed_data.data_type == 'spreadsheet':
-                # Handle spreadsheet data
-                spreadsheet_text = self._spreadsheet_to_text(processed_data.content)
-                response = self.client.models.generate_content(
-                    model=self.config['gemini']['model'],
-                    contents=[spreadsheet_text, prompt],
-                    config=types.GenerateContentConfig(
-                        max_output_tokens=self.config['gemini']['max_tokens'],
-                        temperature=self.config['gemini']['temperature']
-                    )
-                )
-            else:
-                # Handle text content
-                response = self.client.models.generate_content(
-                    model=self.config['gemini']['model'],
-                    contents=[processed_data.content, prompt],
-                    config=types.GenerateContentConfig(
-                        max_output_tokens=self.config['gemini']['max_tokens'],
-                        temperature=self.config['gemini']['temperature']
-                    )
-                )
+            return self.client.models.generate_content(
+                model=self._model,
+                contents=self._build_contents(processed_data, prompt),
+                config=self._gen_cfg
+            )
             
-            return response
+        except Exception as e:
+            logger.error(f"Error sending to Gemini: {str(e)}")
+            raise
+    
+    async def _send_to_gemini_async(self, processed_data: ProcessedData, prompt: str) -> Any:
+        """Send data and prompt to Gemini Vertex AI without blocking the event loop"""
+        try:
+            return await self.client.aio.models.generate_content(
+                model=self._model,
+                contents=self._build_contents(processed_data, prompt),
+                config=self._gen_cfg
+            )
             
         except Exception as e:
             logger.error(f"Error sending to Gemini: {str(e)}")
             raise
     
-    def _get_mime_type(self, file_path: str) -> str:
-        """Get MIME type for file"""
-        extension = Path(file_path).suffix.lower()
-        mime_types = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.bmp': 'image/bmp',
-            '.webp': 'image/webp'
-        }
-        return mime_types.get(extension, 'application/octet-stream')
+    def _build_contents(self, processed_data: ProcessedData, prompt: str) -> List[Any]:
+        """Build the request contents for the given data type"""
+        if processed_data.data_type == 'image':
+            # Handle image content; ProcessedData built outside the loaders may lack the extension
+            extension = processed_data.extension or Path(processed_data.source_file).suffix.lower()
+            return [
+                types.Part.from_bytes(
+                    data=processed_data.content,
+                    mime_type=_MIME_TYPES.get(extension, 'application/octet-stream')
+                ),
+                prompt
+            ]
+        elif processed_data.data_type == 'spreadsheet':
+            # Handle spreadsheet data
+            return [self._spreadsheet_to_text(processed_data.content), prompt]
+        else:
+            # Handle text content
+            return [processed_data.content, prompt]
     
     def _spreadsheet_to_text(self, data_dict: Dict[str, Any]) -> str:
         """Convert spreadsheet data to text format for Gemini"""
-        lines = []
-        lines.append("Spreadsheet Data:")
-        lines.append(f"Columns: {', '.join(data_dict['columns'])}")
-        lines.append(f"Total Rows: {data_dict['shape'][0]}")
-        lines.append("\nFirst 10 rows of data:")
+        row_count = data_dict['shape'][0]
+        
+        # pandas' table formatter renders the preview in one call
+        lines = [
+            "Spreadsheet Data:",
+            f"Columns: {', '.join(data_dict['columns'])}",
+            f"Total Rows: {row_count}",
+            "\nFirst 10 rows of data:"
+        ]
         
-        for i, row in enumerate(data_dict['data'][:10]):
-            row_text = f"Row {i+1}: "
-            row_text += ', '.join([f"{col}: {row[col]}" for col in data_dict['columns']])
-            lines.append(row_text)
+        # Header-only sheets have no rows to show, as before
+        if len(data_dict['head']):
+            lines.append(data_dict['head'].to_string(index=False))
         
-        if data_dict['shape'][0] > 10:
-            lines.append(f"... and {data_dict['shape'][0] - 10} more rows")
+        if row_count > 10:
+            lines.append(f"... and {row_count - 10} more rows")
         
         return '\n'.join(lines)
     
@@ -151,8 +305,8 @@ class GeminiVertexAIProcessor:
             'response': response.text,
             'metadata': {
                 **processed_data.metadata,
-                'gemini_model': self.config['gemini']['model'],
-                'processing_timestamp': pd.Timestamp.now().isoformat()
+                'gemini_model': self._model,
+                'processing_timestamp': datetime.now().isoformat()
             }
         }
         
@@ -167,12 +321,59 @@ class GeminiVertexAIProcessor:
         output_dir = Path(self.config['output']['output_directory'])
         output_dir.mkdir(exist_ok=True)
         
-        timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"results_{timestamp}.json"
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        # Files sharing a stem in different directories must not overwrite each other
+        source = Path(results['source_file'])
+        path_key = _hasher(str(source.resolve()).encode('utf-8')).hexdigest()[:8]
+        filename = f"results_{timestamp}_{source.stem}_{path_key}.json"
         
         output_path = output_dir / filename
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        output_path.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         logger.info(f"Results saved to: {output_path}")
+    
+    def _cache_path(self, file_path: str, data_type: str, prompt: str) -> Optional[Path]:
+        """Cache file for this content and request, or None when caching is off"""
+        if self._cache_dir is None:
+            return None
+        
+        # Everything besides the file bytes that changes what is sent to Gemini
+        gemini_config = self.config['gemini']
+        request_parts = [
+            self._model,
+            gemini_config['max_tokens'],
+            gemini_config['temperature'],
+            data_type,
+            Path(file_path).suffix.lower(),
+            prompt
+        ]
+        if data_type == 'image':
+            request_parts.append(self.config.get('data_processing', {}).get('max_image_dimension'))
+        
+        request_key = _hasher('\0'.join(map(str, request_parts)).encode('utf-8')).hexdigest()[:32]
+        return self._cache_dir / f"{_file_digest(file_path)}.{request_key}.json"
+    
+    def _read_cache(self, cache_path: Optional[Path], file_path: str) -> Optional[Dict[str, Any]]:
+        """Return cached results for this request, if any, saving them like fresh results"""
+        if cache_path is None or not cache_path.exists():
+            return None
+        
+        logger.info(f"Using cached response: {cache_path}")
+        results = orjson.loads(cache_path.read_bytes())
+        # Identical content may have been cached under a different path
+        results['source_file'] = file_path
+        
+        if self.config['output']['save_results']:
+            self._save_results(results)
+        
+        return results
+    
+    def _write_cache(self, cache_path: Optional[Path], results: Dict[str, Any]):
+        """Store results in the cache, replacing the file atomically"""
+        if cache_path is None:
+            return
+        
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(orjson.dumps(results, option=orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_path, cache_path)